@@ -1,11 +1,8 @@
 from __future__ import annotations
 import asyncio
-import os
 import re
 from typing import List, Tuple
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain.agents import create_react_agent, AgentExecutor
 from langchain_core.prompts import PromptTemplate
 from langchain_core.tools import StructuredTool
 from tools.ask_human import ask_human_tool
@@ -13,17 +10,16 @@ from tools.ltm_tool import ltm_search_tool
 from agents.calculator_agent import calculator_agent_tool
 from agents.search_agent import search_agent_tool
 from agents.reasoner_agent import reasoner_agent_tool
+from agents.executors import get_executor
+from budget import DEGRADE_AT, FINALIZE_AT, current_budget
+from model_router import model_router
 from shared_memory import shared_memory
 
 load_dotenv()
 
-if os.getenv("OPENAI_API_KEY"):
-    planner_llm = ChatOpenAI(model="gpt-4o-mini")
-    agent_llm = ChatOpenAI(model="gpt-4o")
-else:
-    planner_llm = agent_llm = None
-
 MAX_STEPS = 20
+# Steps left to the coordinator once the query budget is under pressure.
+DEGRADED_STEPS = 2
 
 AVAILABLE_TOOLS = [
     calculator_agent_tool,
@@ -34,26 +30,17 @@ AVAILABLE_TOOLS = [
 ]
 AVAILABLE_TOOLS = [t for t in AVAILABLE_TOOLS if t]
 
-if agent_llm:
-    prompt = PromptTemplate.from_file("prompts/react_prompt.txt")
-    _agent = create_react_agent(agent_llm, AVAILABLE_TOOLS, prompt)
-    _executor = AgentExecutor(
-        agent=_agent,
-        tools=AVAILABLE_TOOLS,
-        verbose=True,
-        handle_parsing_errors=True,
-    )
-else:
-    _executor = None
-
 plan_prompt = PromptTemplate.from_file("prompts/plan_prompt.txt")
 replan_prompt = PromptTemplate.from_file("prompts/replan_prompt.txt")
+final_prompt = PromptTemplate.from_file("prompts/final_prompt.txt")
 
 
 def _ask_planner(prompt_text: str) -> List[str]:
-    if not planner_llm:
+    if not model_router.configured:
         return []
-    response = planner_llm.invoke(prompt_text)
+    model = model_router.route("planner", prompt_text)[0]
+    with model_router.track("planner", model):
+        response = model_router.get_llm(model).invoke(prompt_text)
     lines = response.content.splitlines()
     return [re.sub(r"^\d+[.)]\s*", "", ln).strip() for ln in lines if ln.strip()]
 
@@ -62,22 +49,41 @@ def initial_plan(query: str) -> List[str]:
     return _ask_planner(plan_prompt.format(input=query, tools=AVAILABLE_TOOLS))
 
 
+def _completed_block(completed: List[Tuple[str, str]]) -> str:
+    return "\n".join(f"- {t}: {r}" for t, r in completed) or "(none)"
+
+
 def replan(query: str, completed: List[Tuple[str, str]]) -> List[str]:
-    completed_block = "\n".join(f"- {t}: {r}" for t, r in completed) or "(none)"
+    completed_block = _completed_block(completed)
     prompt_text = replan_prompt.format(
         tools=AVAILABLE_TOOLS, input=query, completed_block=completed_block
     )
     return _ask_planner(prompt_text)
 
 
+async def final_answer(query: str, completed: List[Tuple[str, str]]) -> str:
+    """Answer from the facts gathered so far, or directly if there are none, without tools."""
+    prompt_text = final_prompt.format(input=query, completed_block=_completed_block(completed))
+    model = model_router.route("planner", prompt_text)[0]
+    with model_router.track("planner", model):
+        response = await model_router.get_llm(model).ainvoke(prompt_text)
+    return response.content.strip()
+
+
 async def run(query: str) -> str:
-    if not _executor:
+    if not model_router.configured:
         raise RuntimeError("LLM is not configured")
     shared_memory.add(f"User query: {query}")
     tasks = initial_plan(query)
     completed: List[Tuple[str, str]] = []
     step = 0
-    while tasks and step < MAX_STEPS:
+    max_steps = MAX_STEPS
+    budget = current_budget()
+    while tasks and step < max_steps:
+        if budget and budget.pressure() >= FINALIZE_AT:
+            return await final_answer(query, completed)
+        if budget and budget.pressure() >= DEGRADE_AT:
+            max_steps = min(max_steps, step + DEGRADED_STEPS)
         step += 1
         current_task = tasks.pop(0)
         facts = "\n".join(f"{k} - {v}" for k, v in completed)
@@ -87,13 +93,27 @@ async def run(query: str) -> str:
             if context
             else f"Current task: {current_task}\nFacts: {facts}"
         )
-        result = await _executor.ainvoke({"input": agent_input})
+        result = await model_router.run_cascade(
+            "coordinator",
+            current_task,
+            lambda model: get_executor(
+                "coordinator",
+                model,
+                AVAILABLE_TOOLS,
+                verbose=True,
+                max_execution_time=None,
+            ).ainvoke({"input": agent_input}),
+            timeout=None,
+        )
         output = result.get("output", "")
         completed.append((current_task, output))
         shared_memory.add(f"{current_task} -> {output}")
         tasks = replan(query, completed)
         if tasks and len(tasks) == 1 and tasks[0] == "Nothing.":
+            tasks = []
             break
-    if completed:
+    # Pending tasks mean the step limit stopped the plan, so the last result
+    # is an intermediate one.
+    if completed and not tasks:
         return completed[-1][1]
-    return ""
+    return await final_answer(query, completed)
@@ -1,15 +1,9 @@
 from __future__ import annotations
-import os
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from model_router import model_router
 
 load_dotenv()
 
-if os.getenv("OPENAI_API_KEY"):
-    critic_llm = ChatOpenAI(model="gpt-4o-mini")
-else:
-    critic_llm = None
-
 CRITIC_SYSTEM_PROMPT = (
     "You are a critical reviewer. Evaluate the assistant's answer provided in the 'Answer' section. "
     "If the answer is clear, correct and safe, respond with only the word 'APPROVED'. "
@@ -18,11 +12,13 @@ CRITIC_SYSTEM_PROMPT = (
 
 async def run_critic(answer: str) -> str:
     """Review the coordinator's answer and either approve or return a critique."""
-    if not critic_llm:
+    if not model_router.configured:
         # If no LLM is configured, pass the answer through.
         return answer
     message = CRITIC_SYSTEM_PROMPT + "\n\nAnswer:\n" + answer
-    result = await critic_llm.ainvoke(message)
+    model = model_router.route("critic", message)[0]
+    with model_router.track("critic", model):
+        result = await model_router.get_llm(model).ainvoke(message)
     verdict = result.content.strip()
     if verdict.upper() == "APPROVED":
         return answer
@@ -0,0 +1,85 @@
+"""Construction and caching of agent executors.
+
+``AGENT_MODE`` selects the executor used by every agent: ``react`` for the
+text ReAct loop or ``tool_calling`` for native function calling with parallel
+tool calls. Executors are cached per agent, mode and model.
+
+In both modes every tool call is cancelled after ``TOOL_TIMEOUT`` seconds, or
+the timeout in the tool's ``metadata``, and when the query runs out of time."""
+from __future__ import annotations
+import asyncio
+import os
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+from dotenv import load_dotenv
+from langchain.agents import create_react_agent, AgentExecutor
+from langchain_core.prompts import PromptTemplate
+from langchain_core.tools import BaseTool, StructuredTool
+from agents.tool_calling import ToolCallingExecutor
+from budget import AGENT_MAX_ITERATIONS, AGENT_TIMEOUT, TOOL_TIMEOUT, run_with_deadline
+from model_router import model_router
+
+load_dotenv()
+
+AGENT_MODE = os.getenv("AGENT_MODE", "react")
+
+react_prompt = PromptTemplate.from_file("prompts/react_prompt.txt")
+with open("prompts/tool_calling_prompt.txt", encoding="utf-8") as f:
+    tool_calling_prompt = f.read()
+
+Executor = Union[AgentExecutor, ToolCallingExecutor]
+_executors: Dict[Tuple[str, str, str], Executor] = {}
+_limited_tools: Dict[str, BaseTool] = {}
+
+
+def _with_deadline(tool: BaseTool) -> BaseTool:
+    """Return a copy of ``tool`` whose calls are cancelled at the tool deadline."""
+    coroutine = getattr(tool, "coroutine", None)
+    if not isinstance(tool, StructuredTool) or not asyncio.iscoroutinefunction(coroutine):
+        return tool
+    if tool.name not in _limited_tools:
+        timeout = (tool.metadata or {}).get("timeout", TOOL_TIMEOUT)
+
+        async def limited(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return await run_with_deadline(coroutine(*args, **kwargs), timeout)
+            except asyncio.TimeoutError:
+                return f"Error in {tool.name}: timed out"
+
+        _limited_tools[tool.name] = tool.model_copy(update={"coroutine": limited})
+    return _limited_tools[tool.name]
+
+
+def get_executor(
+    name: str,
+    model: str,
+    tools: Sequence[BaseTool],
+    verbose: bool = False,
+    max_execution_time: float | None = AGENT_TIMEOUT,
+) -> Executor:
+    """Return the executor for agent ``name`` running on ``model``."""
+    key = (name, AGENT_MODE, model)
+    if key not in _executors:
+        llm = model_router.get_llm(model)
+        tools: List[BaseTool] = [_with_deadline(t) for t in tools]
+        if AGENT_MODE == "tool_calling":
+            _executors[key] = ToolCallingExecutor(
+                llm,
+                tools,
+                tool_calling_prompt,
+                max_turns=AGENT_MAX_ITERATIONS,
+                max_execution_time=max_execution_time,
+                verbose=verbose,
+            )
+        else:
+            _agent = create_react_agent(llm, tools, react_prompt)
+            _executors[key] = AgentExecutor(
+                agent=_agent,
+                tools=tools,
+                verbose=verbose,
+                handle_parsing_errors=True,
+                return_intermediate_steps=True,
+                max_iterations=AGENT_MAX_ITERATIONS,
+                max_execution_time=max_execution_time,
+            )
+    return _executors[key]
@@ -1,43 +1,28 @@
 from __future__ import annotations
-import os
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain.agents import create_react_agent, AgentExecutor
-from langchain_core.prompts import PromptTemplate
 from langchain_core.tools import StructuredTool
 from tools.google_search import google_search_tool
 from tools.open_url import open_url_tool
 from tools.ltm_tool import ltm_search_tool
+from agents.executors import get_executor
+from model_router import model_router
 from shared_memory import shared_memory
 
 load_dotenv()
 
-if os.getenv("OPENAI_API_KEY"):
-    agent_llm = ChatOpenAI(model="gpt-4o")
-else:
-    agent_llm = None
-
 TOOLS = [google_search_tool, open_url_tool, ltm_search_tool]
 TOOLS = [t for t in TOOLS if t]
 
-if agent_llm:
-    prompt = PromptTemplate.from_file("prompts/react_prompt.txt")
-    _agent = create_react_agent(agent_llm, TOOLS, prompt)
-    _executor = AgentExecutor(
-        agent=_agent,
-        tools=TOOLS,
-        verbose=False,
-        handle_parsing_errors=True,
-    )
-else:
-    _executor = None
-
 async def run_search(task: str) -> str:
-    if not _executor:
+    if not model_router.configured:
         raise RuntimeError("LLM is not configured")
     context = shared_memory.get_context()
     agent_input = f"Context:\n{context}\n\nTask: {task}" if context else task
-    result = await _executor.ainvoke({"input": agent_input})
+    result = await model_router.run_cascade(
+        "search",
+        task,
+        lambda model: get_executor("search", model, TOOLS).ainvoke({"input": agent_input}),
+    )
     output = result.get("output", "")
     shared_memory.add(f"Search: {task}\n{output}")
     return output
@@ -45,4 +30,6 @@ async def run_search(task: str) -> str:
 search_agent_tool = StructuredTool.from_function(
     name="use_search_agent",
     coroutine=run_search,
+    # Bounded by AGENT_TIMEOUT per model in run_cascade rather than TOOL_TIMEOUT.
+    metadata={"timeout": None},
 )
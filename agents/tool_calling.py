@@ -0,0 +1,89 @@
+"""Executor based on native function calling.
+
+Unlike the ReAct text loop, the model may request several tool calls in one
+turn. They run concurrently and their observations are returned as tool
+messages, so no scratchpad is re-parsed and there are no parsing retries."""
+from __future__ import annotations
+import asyncio
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+from langchain_core.agents import AgentAction
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.tools import BaseTool
+
+MAX_TURNS = 15
+MAX_OBSERVATION_CHARS = 4000
+
+
+class ToolCallingExecutor:
+    """Drop-in replacement for ``AgentExecutor.ainvoke`` using tool calls."""
+
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        tools: Sequence[BaseTool],
+        system_prompt: str,
+        max_turns: int = MAX_TURNS,
+        max_observation_chars: int = MAX_OBSERVATION_CHARS,
+        max_execution_time: float | None = None,
+        verbose: bool = False,
+    ) -> None:
+        self._tools = {t.name: t for t in tools}
+        self._llm = llm.bind_tools(list(tools)) if tools else llm
+        self.system_prompt = system_prompt
+        self.max_turns = max_turns
+        self.max_observation_chars = max_observation_chars
+        self.max_execution_time = max_execution_time
+        self.verbose = verbose
+
+    def _cap(self, observation: str) -> str:
+        if len(observation) <= self.max_observation_chars:
+            return observation
+        dropped = len(observation) - self.max_observation_chars
+        return observation[: self.max_observation_chars] + f"\n[truncated {dropped} chars]"
+
+    async def _call_tool(self, call: Dict[str, Any]) -> str:
+        tool = self._tools.get(call["name"])
+        if not tool:
+            return f"Error: unknown tool {call['name']}"
+        try:
+            observation = await tool.ainvoke(call["args"])
+        except Exception as e:
+            return f"Error in {call['name']}: {e}"
+        return self._cap(str(observation))
+
+    async def ainvoke(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        messages: List[BaseMessage] = [
+            SystemMessage(self.system_prompt),
+            HumanMessage(inputs["input"]),
+        ]
+        steps: List[Tuple[AgentAction, str]] = []
+        started = time.monotonic()
+        for turn in range(1, self.max_turns + 1):
+            # Like ``AgentExecutor``, the time limit is checked between turns.
+            elapsed = time.monotonic() - started
+            if self.max_execution_time is not None and elapsed >= self.max_execution_time:
+                break
+            response = await self._llm.ainvoke(messages)
+            messages.append(response)
+            if not response.tool_calls:
+                if self.verbose:
+                    print(f"[turn {turn}] Final Answer: {response.content}")
+                return {"output": response.content, "intermediate_steps": steps}
+            if self.verbose:
+                for call in response.tool_calls:
+                    print(f"[turn {turn}] Action: {call['name']} {call['args']}")
+            observations = await asyncio.gather(
+                *(self._call_tool(call) for call in response.tool_calls)
+            )
+            for call, observation in zip(response.tool_calls, observations):
+                if self.verbose:
+                    print(f"[turn {turn}] Observation ({call['name']}): {observation}")
+                messages.append(ToolMessage(observation, tool_call_id=call["id"]))
+                steps.append((AgentAction(call["name"], call["args"], ""), observation))
+        return {
+            "output": "Agent stopped due to iteration limit or time limit.",
+            "intermediate_steps": steps,
+        }
@@ -0,0 +1,100 @@
+"""Compare the ReAct and tool-calling executors on ``metadata.jsonl``.
+
+For every question and mode the script records the number of LLM turns (all
+chat completions made by the coordinator, planner, sub-agents and critic),
+wall-clock latency, cost and whether the answer matches ``Final answer``.
+
+Every run starts from empty shared memory and a scratch long-term memory, so
+one mode cannot reuse the other's findings, and the mode that goes first
+alternates between questions.
+
+Usage: ``python benchmark.py --limit 5 --level 1``"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+import agents.executors as executors
+from budget import QueryBudget
+from long_term_memory import long_term_memory
+from main import answer
+from shared_memory import shared_memory
+
+MODES = ("react", "tool_calling")
+
+
+def load_questions(path: str, limit: int, level: int | None) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    records = [r for r in records if not r.get("file_name")]
+    if level is not None:
+        records = [r for r in records if r.get("Level") == level]
+    return records[:limit]
+
+
+async def run_benchmark(records: List[Dict], modes=MODES) -> List[Dict]:
+    rows = []
+    scratch = tempfile.mkdtemp(prefix="mallm_bench_")
+    for i, record in enumerate(records):
+        order = modes if i % 2 == 0 else tuple(reversed(modes))
+        for mode in order:
+            executors.AGENT_MODE = mode
+            run_dir = os.path.join(scratch, f"{i}_{mode}")
+            long_term_memory.reopen(
+                os.path.join(run_dir, "ltm_memory.txt"), os.path.join(run_dir, "ltm_db")
+            )
+            shared_memory.clear()
+            # An unlimited budget only counts, so neither mode is cut short.
+            budget = QueryBudget()
+            started = time.perf_counter()
+            try:
+                output = await answer(record["Question"], record.get("Level"), budget)
+            except Exception as e:
+                output = f"Error: {e}"
+            rows.append(
+                {
+                    "task_id": record["task_id"],
+                    "mode": mode,
+                    "llm_turns": budget.llm_calls,
+                    "latency": time.perf_counter() - started,
+                    "cost": budget.cost,
+                    "correct": output.strip().lower() == str(record["Final answer"]).strip().lower(),
+                }
+            )
+    return rows
+
+
+def summarize(rows: List[Dict]) -> str:
+    lines = ["mode: tasks avg_turns avg_latency(s) avg_cost($) correct"]
+    for mode in MODES:
+        mode_rows = [r for r in rows if r["mode"] == mode]
+        if not mode_rows:
+            continue
+        n = len(mode_rows)
+        turns = sum(r["llm_turns"] for r in mode_rows) / n
+        latency = sum(r["latency"] for r in mode_rows) / n
+        cost = sum(r["cost"] for r in mode_rows) / n
+        correct = sum(r["correct"] for r in mode_rows)
+        lines.append(f"{mode}: {n} {turns:.1f} {latency:.1f} {cost:.4f} {correct}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default="metadata.jsonl")
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--level", type=int, default=None)
+    args = parser.parse_args()
+    records = load_questions(args.path, args.limit, args.level)
+    rows = asyncio.run(run_benchmark(records))
+    for row in rows:
+        print(json.dumps(row))
+    print(summarize(rows))
+
+
+if __name__ == "__main__":
+    main()
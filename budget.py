@@ -0,0 +1,198 @@
+"""Per-query token, cost and wall-clock budgets.
+
+A ``QueryBudget`` is attached to the current query with ``use_budget``. While
+it is active it receives the callbacks of every chat model call made in that
+context, including calls from sub-agents, and long-term memory reports its
+embedding calls to it. Agents read ``pressure()`` to degrade gracefully and
+wrap work in ``run_with_deadline`` so that it is cancelled when time runs out."""
+from __future__ import annotations
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from dotenv import load_dotenv
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+
+load_dotenv()
+
+# USD per 1M tokens: (prompt, completion).
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "o3": (2.00, 8.00),
+    "text-embedding-ada-002": (0.10, 0.0),
+}
+
+# Share of the most used budget dimension at which agents switch to the
+# cheapest model and shorten the plan, and at which the coordinator stops.
+DEGRADE_AT = 0.7
+FINALIZE_AT = 0.9
+
+# Caps for a single sub-agent run and a single tool call.
+AGENT_MAX_ITERATIONS = int(os.getenv("AGENT_MAX_ITERATIONS", "10"))
+AGENT_TIMEOUT = float(os.getenv("AGENT_TIMEOUT", "180"))
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "60"))
+
+T = TypeVar("T")
+
+
+def price_for(model: str) -> Tuple[float, float]:
+    """Return the price of ``model``, matching dated names like ``gpt-4o-2024-08-06``."""
+    matches = [name for name in MODEL_PRICES if model.startswith(name)]
+    if not matches:
+        return (0.0, 0.0)
+    return MODEL_PRICES[max(matches, key=len)]
+
+
+def token_usage(response: LLMResult) -> List[Tuple[str, int, int]]:
+    """Return ``(model, prompt_tokens, completion_tokens)`` for each generation of a call."""
+    output = response.llm_output or {}
+    usages = []
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None)
+            if usage:
+                model = message.response_metadata.get("model_name")
+                model = model or output.get("model_name", "")
+                usages.append((model, usage["input_tokens"], usage["output_tokens"]))
+    if not usages:
+        usage = output.get("token_usage") or {}
+        usages.append(
+            (
+                output.get("model_name", ""),
+                usage.get("prompt_tokens", 0),
+                usage.get("completion_tokens", 0),
+            )
+        )
+    return usages
+
+
+def _env_number(name: str, cast=float) -> Any:
+    value = os.getenv(name)
+    return cast(value) if value else None
+
+
+class QueryBudget(BaseCallbackHandler):
+    """Token, cost and wall-clock limits for one query. ``None`` means unlimited."""
+
+    def __init__(
+        self,
+        max_tokens: int | None = None,
+        max_cost: float | None = None,
+        max_seconds: float | None = None,
+    ) -> None:
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.max_seconds = max_seconds
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.embedding_tokens = 0
+        self.cost = 0.0
+        self.llm_calls = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "QueryBudget":
+        """Build a budget from ``QUERY_MAX_TOKENS``, ``QUERY_MAX_COST`` and ``QUERY_MAX_SECONDS``."""
+        return cls(
+            max_tokens=_env_number("QUERY_MAX_TOKENS", int),
+            max_cost=_env_number("QUERY_MAX_COST"),
+            max_seconds=_env_number("QUERY_MAX_SECONDS"),
+        )
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens + self.embedding_tokens
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining_seconds(self) -> float | None:
+        if self.max_seconds is None:
+            return None
+        return max(0.0, self.max_seconds - self.elapsed)
+
+    def add_usage(self, model: str, prompt_tokens: int, completion_tokens: int = 0) -> None:
+        """Account tokens spent on ``model``."""
+        prompt_price, completion_price = price_for(model)
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.cost += (
+                prompt_tokens * prompt_price + completion_tokens * completion_price
+            ) / 1_000_000
+
+    def add_embedding(self, text: str, model: str = "text-embedding-ada-002") -> None:
+        """Account an embedding call, estimating four characters per token."""
+        tokens = max(1, len(text) // 4)
+        prompt_price, _ = price_for(model)
+        with self._lock:
+            self.embedding_tokens += tokens
+            self.cost += tokens * prompt_price / 1_000_000
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        with self._lock:
+            self.llm_calls += 1
+        for model, prompt_tokens, completion_tokens in token_usage(response):
+            self.add_usage(model, prompt_tokens, completion_tokens)
+
+    def pressure(self) -> float:
+        """Return the used share of the most consumed budget dimension."""
+        used = [0.0]
+        if self.max_tokens:
+            used.append(self.total_tokens / self.max_tokens)
+        if self.max_cost:
+            used.append(self.cost / self.max_cost)
+        if self.max_seconds:
+            used.append(self.elapsed / self.max_seconds)
+        return max(used)
+
+    def exhausted(self) -> bool:
+        return self.pressure() >= 1.0
+
+    def report(self) -> str:
+        return (
+            f"llm calls: {self.llm_calls}, tokens: {self.total_tokens} (embeddings {self.embedding_tokens}), "
+            f"cost: ${self.cost:.4f}, time: {self.elapsed:.1f}s, "
+            f"pressure: {self.pressure():.0%}"
+        )
+
+
+_budget_var: ContextVar[Optional[QueryBudget]] = ContextVar("query_budget", default=None)
+# Every callback manager configured while a budget is active gets it as a handler.
+register_configure_hook(_budget_var, True)
+
+
+def current_budget() -> Optional[QueryBudget]:
+    """Return the budget of the query being answered, if any."""
+    return _budget_var.get()
+
+
+@contextmanager
+def use_budget(budget: QueryBudget) -> Iterator[QueryBudget]:
+    """Attach ``budget`` to all LLM and embedding calls made inside the block."""
+    token = _budget_var.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget_var.reset(token)
+
+
+async def run_with_deadline(aw: Awaitable[T], timeout: float | None = None) -> T:
+    """Await ``aw``, cancelling it after ``timeout`` or when the query runs out of time.
+
+    Raises ``asyncio.TimeoutError`` when cancelled."""
+    budget = current_budget()
+    limits = [t for t in (timeout, budget.remaining_seconds() if budget else None) if t is not None]
+    if not limits:
+        return await aw
+    return await asyncio.wait_for(aw, min(limits))
@@ -0,0 +1,148 @@
+"""Non-blocking channels for asking a human a question.
+
+``HumanChannel.ask`` suspends only the calling coroutine; other agents, HTTP
+fetches and browser sessions keep running while the question is pending. Each
+question has a timeout after which the channel's default answer is returned.
+
+``StdinChannel`` reads the terminal on a daemon thread. ``QueueChannel`` keeps
+questions in process so that a UI (e.g. Streamlit), an HTTP endpoint or a
+script can answer them, from any thread, via ``QueueChannel.answer``."""
+from __future__ import annotations
+import asyncio
+import os
+import sys
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HUMAN_TIMEOUT = float(os.getenv("HUMAN_TIMEOUT", "300"))
+DEFAULT_ANSWER = "The user did not answer. Continue with your best judgement."
+
+
+def _resolve(future: asyncio.Future, answer: str) -> None:
+    if not future.done():
+        future.set_result(answer)
+
+
+class HumanChannel(ABC):
+    """Base class for asynchronous human-input channels."""
+
+    def __init__(
+        self, timeout: float | None = HUMAN_TIMEOUT, default_answer: str = DEFAULT_ANSWER
+    ) -> None:
+        self.timeout = timeout
+        self.default_answer = default_answer
+
+    async def ask(
+        self, question: str, timeout: float | None = None, default: str | None = None
+    ) -> str:
+        """Return the human's answer, or the default answer on timeout."""
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(self._ask(question), timeout)
+        except asyncio.TimeoutError:
+            return self.default_answer if default is None else default
+
+    @abstractmethod
+    async def _ask(self, question: str) -> str:
+        """Deliver ``question`` and return the answer, waiting as long as needed."""
+
+
+class StdinChannel(HumanChannel):
+    """Ask on stdout and read answers on a background reader thread.
+
+    Questions are asked one at a time. A line typed after its question timed
+    out is discarded rather than given to the next question."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._lock: Optional[asyncio.Lock] = None
+        self._waiting: Optional[asyncio.Future] = None
+        self._waiting_lock = threading.Lock()
+        self._reader: Optional[threading.Thread] = None
+
+    def _read_lines(self) -> None:
+        for line in sys.stdin:
+            with self._waiting_lock:
+                future = self._waiting
+                self._waiting = None
+            if future is not None:
+                future.get_loop().call_soon_threadsafe(_resolve, future, line.rstrip("\n"))
+
+    async def _ask(self, question: str) -> str:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        if self._reader is None:
+            self._reader = threading.Thread(target=self._read_lines, daemon=True)
+            self._reader.start()
+        async with self._lock:
+            future = asyncio.get_running_loop().create_future()
+            with self._waiting_lock:
+                self._waiting = future
+            print(f"\n{question}\nInput: ", end="", flush=True)
+            try:
+                return await future
+            finally:
+                with self._waiting_lock:
+                    if self._waiting is future:
+                        self._waiting = None
+
+
+class QueueChannel(HumanChannel):
+    """Keep pending questions in process for an external responder.
+
+    Responders in the same event loop can ``await questions.get()``; UIs and
+    HTTP handlers in other threads can poll ``pending()``. Both reply with
+    ``answer(question_id, text)``."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.questions: asyncio.Queue[Tuple[str, str]] = asyncio.Queue()
+        self._pending: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self._pending_lock = threading.Lock()
+
+    def pending(self) -> Dict[str, str]:
+        """Return unanswered questions keyed by question id."""
+        with self._pending_lock:
+            return {qid: question for qid, (question, _) in self._pending.items()}
+
+    def answer(self, question_id: str, text: str) -> bool:
+        """Answer a pending question; return ``False`` if it is no longer pending."""
+        with self._pending_lock:
+            entry = self._pending.pop(question_id, None)
+        if entry is None:
+            return False
+        future = entry[1]
+        future.get_loop().call_soon_threadsafe(_resolve, future, text)
+        return True
+
+    async def _ask(self, question: str) -> str:
+        question_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        with self._pending_lock:
+            self._pending[question_id] = (question, future)
+        try:
+            await self.questions.put((question_id, question))
+            return await future
+        finally:
+            with self._pending_lock:
+                self._pending.pop(question_id, None)
+
+
+_channel: HumanChannel = StdinChannel()
+
+
+def get_human_channel() -> HumanChannel:
+    """Return the channel used by the ``ask_human`` tools."""
+    return _channel
+
+
+def set_human_channel(channel: HumanChannel) -> None:
+    """Route all future ``ask_human`` questions through ``channel``."""
+    global _channel
+    _channel = channel
@@ -1,15 +1,24 @@
 from __future__ import annotations
 import os
+import threading
+import time
 import uuid
-from typing import List
+from typing import Any, Dict, List, Sequence
 
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import Chroma
+from budget import current_budget
 
 class LongTermMemory:
     """Persistent memory stored locally with embeddings for retrieval."""
 
     def __init__(self, path: str = "ltm_memory.txt", persist_dir: str = "ltm_db") -> None:
+        # Serialises writers; readers never take it.
+        self._lock = threading.Lock()
+        self.reopen(path, persist_dir)
+
+    def reopen(self, path: str, persist_dir: str) -> None:
+        """Switch this memory to the log at ``path`` and the index in ``persist_dir``."""
         self.path = path
         self.persist_dir = persist_dir
         os.makedirs(self.persist_dir, exist_ok=True)
@@ -24,13 +33,23 @@ class LongTermMemory:
             persist_directory=self.persist_dir,
         )
 
+    @staticmethod
+    def _charge_embedding(text: str) -> None:
+        budget = current_budget()
+        if budget:
+            budget.add_embedding(text)
+
     def add(self, text: str) -> None:
         """Append a new entry to disk and vector store."""
-        with open(self.path, "a", encoding="utf-8") as f:
-            f.write(text + "\n")
-        if self._embeddings:
-            self._store.add_texts([text], ids=[str(uuid.uuid4())])
-            self._store.persist()
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(text + "\n")
+            if self._embeddings:
+                self._charge_embedding(text)
+                self._store.add_texts(
+                    [text], metadatas=[{"ts": time.time()}], ids=[str(uuid.uuid4())]
+                )
+                self._store.persist()
 
     def get_context(self, n: int | None = None) -> str:
         """Return the last ``n`` entries joined as a single string."""
@@ -44,8 +63,75 @@ class LongTermMemory:
         """Return the most similar stored entries to ``query``."""
         if not self._embeddings:
             return []
+        self._charge_embedding(query)
         results = self._store.similarity_search(query, k=k)
         return [r.page_content for r in results]
 
+    def search_by_vector(self, embedding: Sequence[float], k: int = 5) -> List[str]:
+        """Return the entries most similar to a precomputed embedding."""
+        results = self._store.similarity_search_by_vector(list(embedding), k=k)
+        return [r.page_content for r in results]
+
+    def entries(self) -> Dict[str, Any]:
+        """Return ids, texts, metadata and embeddings of all indexed entries."""
+        return self._store.get(include=["documents", "metadatas", "embeddings"])
+
+    def replace(
+        self,
+        remove_ids: Sequence[str],
+        texts: Sequence[str] = (),
+        metadatas: Sequence[Dict[str, Any]] = (),
+    ) -> None:
+        """Swap entries in the vector store and rewrite the text log to match it.
+
+        New entries are added before old ones are removed, so concurrent
+        searches never miss the merged content. The log is rebuilt outside the
+        writer lock; under it, only the lines appended since the snapshot are
+        copied over before the log is replaced atomically. Log lines that
+        belong to no indexed entry, e.g. ones written while no API key was
+        set, are kept at the start of the log."""
+        if texts:
+            self._charge_embedding("\n".join(texts))
+            self._store.add_texts(
+                list(texts), metadatas=list(metadatas), ids=[str(uuid.uuid4()) for _ in texts]
+            )
+        removed: List[str] = []
+        if remove_ids:
+            removed = self._store.get(ids=list(remove_ids), include=["documents"])["documents"]
+            self._store.delete(ids=list(remove_ids))
+        self._store.persist()
+
+        with self._lock:
+            # ``add`` stamps entries after writing them, so every entry newer
+            # than ``snapshot_ts`` is in the log past ``offset``.
+            offset = os.path.getsize(self.path)
+            snapshot_ts = time.time()
+        with open(self.path, "rb") as f:
+            logged = f.read(offset).decode("utf-8").splitlines()
+        data = self._store.get(include=["documents", "metadatas"])
+        stamped = [
+            (text, (meta or {}).get("ts", 0.0))
+            for text, meta in zip(data["documents"], data["metadatas"])
+        ]
+        ordered = sorted(
+            (item for item in stamped if item[1] <= snapshot_ts), key=lambda item: item[1]
+        )
+        indexed_lines = {
+            line for text in [t for t, _ in stamped] + removed for line in text.splitlines()
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for line in logged:
+                if line not in indexed_lines:
+                    f.write(line + "\n")
+            for text, _ in ordered:
+                f.write(text + "\n")
+
+        with self._lock:
+            with open(self.path, "rb") as src, open(tmp_path, "ab") as dst:
+                src.seek(offset)
+                dst.write(src.read())
+            os.replace(tmp_path, self.path)
+
 
 long_term_memory = LongTermMemory()
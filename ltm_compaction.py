@@ -0,0 +1,247 @@
+"""Compaction of the long-term memory.
+
+``SharedMemory`` writes every agent step to long-term memory, so the index
+fills with near-duplicates that slow ``search_ltm`` and crowd its top-k
+results. ``compact`` drops stale low-value entries under a retention policy,
+clusters near-duplicates by embedding similarity and merges each cluster into
+its most complete entry, or a summary for larger clusters.
+
+Compaction is incremental: only entries added since the previous run are
+compared against the index, and searches keep working while it runs.
+
+Usage: ``python ltm_compaction.py --threshold 0.92 --max-age-days 90``"""
+from __future__ import annotations
+import argparse
+import json
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from long_term_memory import LongTermMemory, long_term_memory
+from model_router import model_router
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_THRESHOLD = 0.92
+# Clusters at least this large are summarised instead of keeping one entry.
+SUMMARISE_MIN = 3
+LATENCY_SAMPLES = 20
+
+SUMMARY_PROMPT = (
+    "The following long-term memory entries are near-duplicates. Merge them into a single "
+    "concise entry that keeps every distinct fact. Return only the merged entry."
+)
+
+
+@dataclass
+class RetentionPolicy:
+    """Which entries are old or low-value enough to drop. Ages are in days."""
+
+    max_age_days: float | None = 90
+    low_value_age_days: float = 1
+    low_value_prefixes: Tuple[str, ...] = ("User query:",)
+    min_chars: int = 20
+
+    def is_stale(self, text: str, ts: float | None, now: float) -> bool:
+        # Entries written before timestamps were recorded have an unknown age.
+        if ts is None:
+            return False
+        age_days = (now - ts) / 86400
+        if self.max_age_days is not None and age_days > self.max_age_days:
+            return True
+        low_value = len(text) < self.min_chars or text.startswith(self.low_value_prefixes)
+        return low_value and age_days > self.low_value_age_days
+
+
+@dataclass
+class CompactionReport:
+    entries_before: int = 0
+    entries_after: int = 0
+    dropped: int = 0
+    merged_clusters: int = 0
+    summarised: int = 0
+    # UTF-8 size of the indexed documents. Chroma does not shrink its sqlite
+    # and HNSW files when entries are deleted, so file sizes are not compared.
+    document_bytes_before: int = 0
+    document_bytes_after: int = 0
+    search_ms_before: float = 0.0
+    search_ms_after: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"entries: {self.entries_before} -> {self.entries_after} "
+            f"(dropped {self.dropped}, merged clusters {self.merged_clusters}, "
+            f"summarised {self.summarised})\n"
+            f"document size: {self.document_bytes_before} -> {self.document_bytes_after} bytes\n"
+            f"search latency: {self.search_ms_before:.2f} -> {self.search_ms_after:.2f} ms"
+        )
+
+
+def _document_bytes(texts: Sequence[str]) -> int:
+    return sum(len(text.encode("utf-8")) for text in texts)
+
+
+def _search_ms(memory: LongTermMemory, vectors: Sequence[Sequence[float]]) -> float:
+    """Return the mean latency of a top-5 vector search over ``vectors``."""
+    if not vectors:
+        return 0.0
+    started = time.perf_counter()
+    for vector in vectors:
+        memory.search_by_vector(vector, k=5)
+    return (time.perf_counter() - started) * 1000 / len(vectors)
+
+
+def _state_path(memory: LongTermMemory) -> str:
+    return os.path.join(memory.persist_dir, "compaction.json")
+
+
+def _load_watermark(memory: LongTermMemory) -> Optional[float]:
+    try:
+        with open(_state_path(memory), "r", encoding="utf-8") as f:
+            return json.load(f)["watermark"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _save_watermark(memory: LongTermMemory, watermark: float) -> None:
+    with open(_state_path(memory), "w", encoding="utf-8") as f:
+        json.dump({"watermark": watermark}, f)
+
+
+def _cluster(
+    unit: np.ndarray, old: List[int], new: List[int], threshold: float
+) -> Dict[int, List[int]]:
+    """Greedily attach each new entry to its most similar representative.
+
+    Entries that survived a previous compaction are already distinct, so they
+    are only compared with new entries, never with each other."""
+    reps = list(old)
+    clusters: Dict[int, List[int]] = {}
+    for i in new:
+        if reps:
+            sims = unit[reps] @ unit[i]
+            best = int(np.argmax(sims))
+            if sims[best] >= threshold:
+                clusters.setdefault(reps[best], [reps[best]]).append(i)
+                continue
+        reps.append(i)
+    return clusters
+
+
+def _summarise(texts: List[str]) -> Optional[str]:
+    if not model_router.configured:
+        return None
+    model = model_router.route("memory")[0]
+    prompt_text = SUMMARY_PROMPT + "\n\n" + "\n---\n".join(texts)
+    with model_router.track("memory", model):
+        response = model_router.get_llm(model).invoke(prompt_text)
+    return response.content.strip() or None
+
+
+def compact(
+    memory: LongTermMemory = long_term_memory,
+    threshold: float = SIMILARITY_THRESHOLD,
+    retention: RetentionPolicy | None = None,
+    summarise: bool = True,
+) -> CompactionReport:
+    """Deduplicate and prune ``memory`` and return before/after statistics."""
+    retention = retention or RetentionPolicy()
+    report = CompactionReport()
+    data = memory.entries()
+    ids: List[str] = list(data["ids"])
+    texts: List[str] = list(data["documents"])
+    metas = [m or {} for m in data["metadatas"]]
+    vectors = data["embeddings"] if data["embeddings"] is not None else []
+    report.entries_before = len(ids)
+    report.document_bytes_before = _document_bytes(texts)
+    if not ids:
+        return report
+
+    sample = random.Random(0).sample(range(len(ids)), min(LATENCY_SAMPLES, len(ids)))
+    probes = [vectors[i] for i in sample]
+    report.search_ms_before = _search_ms(memory, probes)
+
+    now = time.time()
+    watermark = _load_watermark(memory)
+    remove: List[str] = []
+    kept: List[int] = []
+    for i, (text, meta) in enumerate(zip(texts, metas)):
+        if retention.is_stale(text, meta.get("ts"), now):
+            remove.append(ids[i])
+        else:
+            kept.append(i)
+    report.dropped = len(remove)
+
+    unit = np.asarray(vectors, dtype=float)
+    unit /= np.clip(np.linalg.norm(unit, axis=1, keepdims=True), 1e-12, None)
+
+    def is_new(i: int) -> bool:
+        return watermark is None or metas[i].get("ts", 0.0) > watermark
+
+    old = [i for i in kept if not is_new(i)]
+    new = sorted((i for i in kept if is_new(i)), key=lambda i: metas[i].get("ts", 0.0))
+    add_texts: List[str] = []
+    add_metas: List[Dict[str, float]] = []
+    for members in _cluster(unit, old, new, threshold).values():
+        report.merged_clusters += 1
+        summary = None
+        if summarise and len(members) >= SUMMARISE_MIN:
+            summary = _summarise(list(dict.fromkeys(texts[i] for i in members)))
+        if summary:
+            report.summarised += 1
+            add_texts.append(summary)
+            add_metas.append({"ts": max(metas[i].get("ts", 0.0) for i in members)})
+            remove.extend(ids[i] for i in members)
+        else:
+            keep = max(members, key=lambda i: (len(texts[i]), metas[i].get("ts", 0.0)))
+            remove.extend(ids[i] for i in members if i != keep)
+
+    memory.replace(remove, add_texts, add_metas)
+    # The newest entry of the snapshot, not the clock: entries written while
+    # this run was in progress must still count as new next time.
+    stamps = [m["ts"] for m in metas if "ts" in m]
+    _save_watermark(memory, max(stamps, default=watermark or 0.0))
+
+    after = memory.entries()["documents"]
+    report.entries_after = len(after)
+    report.document_bytes_after = _document_bytes(after)
+    report.search_ms_after = _search_ms(memory, probes)
+    return report
+
+
+def start_background_compaction(
+    interval: float = 3600, memory: LongTermMemory = long_term_memory, **kwargs
+) -> threading.Thread:
+    """Run ``compact`` every ``interval`` seconds on a daemon thread."""
+
+    def loop() -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                logger.info("LTM compaction:\n%s", compact(memory, **kwargs))
+            except Exception:
+                logger.exception("LTM compaction failed")
+
+    thread = threading.Thread(target=loop, name="ltm-compaction", daemon=True)
+    thread.start()
+    return thread
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threshold", type=float, default=SIMILARITY_THRESHOLD)
+    parser.add_argument("--max-age-days", type=float, default=RetentionPolicy.max_age_days)
+    parser.add_argument("--no-summarise", action="store_true")
+    args = parser.parse_args()
+    retention = RetentionPolicy(max_age_days=args.max_age_days)
+    print(compact(threshold=args.threshold, retention=retention, summarise=not args.no_summarise))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ import asyncio
 
 from agents.coordinator_agent import run as run_coordinator
 from agents.critic_agent import run_critic
+from budget import DEGRADE_AT, QueryBudget, use_budget
+from model_router import model_router
 
 # Example query. Replace or pass via CLI as needed.
 QUERY = (
@@ -10,10 +12,27 @@ QUERY = (
 )
 
 
+async def answer(
+    query: str, level: int | None = None, budget: QueryBudget | None = None
+) -> str:
+    """Answer ``query`` within ``budget``, retrying once with escalated models if the critic rejects it."""
+    budget = budget or QueryBudget.from_env()
+    with use_budget(budget), model_router.start_query(level):
+        coord_result = await run_coordinator(query)
+        final_result = await run_critic(coord_result)
+        if final_result.startswith("Critique:") and budget.pressure() < DEGRADE_AT:
+            model_router.record_failure()
+            coord_result = await run_coordinator(query)
+            final_result = await run_critic(coord_result)
+    return final_result
+
+
 def main(query: str = QUERY) -> None:
-    coord_result = asyncio.run(run_coordinator(query))
-    final_result = asyncio.run(run_critic(coord_result))
+    budget = QueryBudget.from_env()
+    final_result = asyncio.run(answer(query, budget=budget))
     print(final_result)
+    print(model_router.report())
+    print(budget.report())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,257 @@
+"""Per-call model selection with cheap-first cascades.
+
+Every agent asks the router which models to try for a task. The router picks a
+starting tier from simple task features (agent role, task length, prior
+failures and the benchmark ``Level``) and returns the cascade from that tier
+upwards. ``run_cascade`` walks the cascade and escalates only when a cheaper
+model's result is rejected. Latency, tokens and cost are recorded per route."""
+from __future__ import annotations
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from uuid import UUID
+
+from dotenv import load_dotenv
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+from langchain_openai import ChatOpenAI
+from budget import (
+    AGENT_TIMEOUT,
+    DEGRADE_AT,
+    current_budget,
+    price_for,
+    run_with_deadline,
+    token_usage,
+)
+
+load_dotenv()
+
+# Models available to each agent role, cheapest first.
+ROLE_TIERS: Dict[str, List[str]] = {
+    "coordinator": ["gpt-4o"],
+    "planner": ["gpt-4o-mini"],
+    "critic": ["gpt-4o-mini"],
+    "memory": ["gpt-4o-mini"],
+    "search": ["gpt-4o-mini", "gpt-4o"],
+    "calculator": ["gpt-4o-mini", "gpt-4o"],
+    "reasoner": ["gpt-4o-mini", "o3"],
+}
+
+# Tasks longer than this start one tier higher.
+LONG_TASK_CHARS = 400
+
+# Phrases that mark an answer as not worth keeping from a cheap model.
+LOW_CONFIDENCE_MARKERS = (
+    "i don't know",
+    "i do not know",
+    "unable to determine",
+    "cannot determine",
+    "not enough information",
+    "agent stopped due to",
+)
+
+
+def is_acceptable(result: Dict[str, Any]) -> bool:
+    """Return ``False`` for empty, low-confidence or parse-error results."""
+    output = str(result.get("output", "")).strip()
+    if not output:
+        return False
+    for action, _ in result.get("intermediate_steps", []):
+        # ``AgentExecutor`` records recovered parsing errors as ``_Exception``.
+        if getattr(action, "tool", None) == "_Exception":
+            return False
+    lowered = output.lower()
+    return not any(marker in lowered for marker in LOW_CONFIDENCE_MARKERS)
+
+
+@dataclass
+class RouteStats:
+    """Accumulated accounting for one ``(role, model)`` route."""
+
+    calls: int = 0
+    rejected: int = 0
+    latency: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+
+
+@dataclass
+class QueryRouting:
+    """Routing features of one query: its benchmark ``Level`` and failures per role."""
+
+    level: Optional[int] = None
+    failures: Dict[str, int] = field(default_factory=dict)
+
+
+_query_var: ContextVar[Optional[QueryRouting]] = ContextVar("query_routing", default=None)
+
+
+class _RouteTracker(BaseCallbackHandler):
+    """Count the tokens of the LLM calls made inside one ``track`` block.
+
+    Usage is forwarded to the enclosing tracker as well. A call may reach a
+    tracker both directly and through a nested one, so calls are counted once
+    per tracker by ``run_id``."""
+
+    def __init__(self, parent: Optional["_RouteTracker"]) -> None:
+        self.parent = parent
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+        self._seen: Set[UUID] = set()
+        self._lock = threading.Lock()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        usages = token_usage(response)
+        prompt_tokens = sum(u[1] for u in usages)
+        completion_tokens = sum(u[2] for u in usages)
+        cost = 0.0
+        for model, prompt, completion in usages:
+            prompt_price, completion_price = price_for(model)
+            cost += (prompt * prompt_price + completion * completion_price) / 1_000_000
+        tracker: Optional[_RouteTracker] = self
+        while tracker is not None:
+            with tracker._lock:
+                if run_id not in tracker._seen:
+                    tracker._seen.add(run_id)
+                    tracker.prompt_tokens += prompt_tokens
+                    tracker.completion_tokens += completion_tokens
+                    tracker.cost += cost
+            tracker = tracker.parent
+
+
+_tracker_var: ContextVar[Optional[_RouteTracker]] = ContextVar("route_tracker", default=None)
+# Every callback manager configured inside a ``track`` block gets its tracker.
+register_configure_hook(_tracker_var, True)
+
+
+class ModelRouter:
+    """Choose a model per call and keep per-route latency/cost accounting."""
+
+    def __init__(self, long_task_chars: int = LONG_TASK_CHARS) -> None:
+        self.long_task_chars = long_task_chars
+        # Used by calls made outside ``start_query``.
+        self._default_query = QueryRouting()
+        self.stats: Dict[Tuple[str, str], RouteStats] = {}
+        self._llms: Dict[str, ChatOpenAI] = {}
+
+    @property
+    def configured(self) -> bool:
+        return bool(os.getenv("OPENAI_API_KEY"))
+
+    @property
+    def query(self) -> QueryRouting:
+        """Return the routing features of the query being answered."""
+        return _query_var.get() or self._default_query
+
+    @contextmanager
+    def start_query(self, level: int | None = None) -> Iterator[QueryRouting]:
+        """Route the calls made inside the block with fresh per-query features."""
+        token = _query_var.set(QueryRouting(level=level))
+        try:
+            yield _query_var.get()
+        finally:
+            _query_var.reset(token)
+
+    def record_failure(self, role: str | None = None) -> None:
+        """Escalate future calls for ``role`` (or every role if ``None``)."""
+        failures = self.query.failures
+        roles = [role] if role else list(ROLE_TIERS)
+        for r in roles:
+            failures[r] = min(failures.get(r, 0) + 1, len(ROLE_TIERS[r]))
+
+    def get_llm(self, model: str) -> Optional[ChatOpenAI]:
+        """Return a cached chat model, or ``None`` if no API key is set."""
+        if not self.configured:
+            return None
+        if model not in self._llms:
+            self._llms[model] = ChatOpenAI(model=model)
+        return self._llms[model]
+
+    def route(self, role: str, task: str = "") -> List[str]:
+        """Return the models to try for ``task``, cheapest acceptable first."""
+        tiers = ROLE_TIERS[role]
+        budget = current_budget()
+        if budget and budget.pressure() >= DEGRADE_AT:
+            return tiers[:1]
+        query = self.query
+        if query.level is not None and query.level >= 3:
+            return tiers[-1:]
+        start = 1 if len(task) > self.long_task_chars else 0
+        if query.level is not None and query.level <= 1:
+            # Easy questions stay on the cheapest tier unless something failed.
+            start = max(0, start - 1)
+        start += query.failures.get(role, 0)
+        return tiers[min(start, len(tiers) - 1):]
+
+    @contextmanager
+    def track(self, role: str, model: str) -> Iterator[RouteStats]:
+        """Record latency and token usage of the LLM calls made inside the block.
+
+        Tracking nests, so coordinator routes also include the tokens spent by
+        the sub-agents they call."""
+        stats = self.stats.setdefault((role, model), RouteStats())
+        tracker = _RouteTracker(_tracker_var.get())
+        token = _tracker_var.set(tracker)
+        started = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            _tracker_var.reset(token)
+            stats.calls += 1
+            stats.latency += time.perf_counter() - started
+            stats.prompt_tokens += tracker.prompt_tokens
+            stats.completion_tokens += tracker.completion_tokens
+            stats.cost += tracker.cost
+
+    async def run_cascade(
+        self,
+        role: str,
+        task: str,
+        call: Callable[[str], Awaitable[Dict[str, Any]]],
+        accept: Callable[[Dict[str, Any]], bool] = is_acceptable,
+        timeout: float | None = AGENT_TIMEOUT,
+    ) -> Dict[str, Any]:
+        """Run ``call(model)`` along the cascade until a result is accepted.
+
+        Each call is cancelled after ``timeout`` seconds or when the query's
+        time budget runs out. The cascade stops escalating once the budget is
+        under pressure, and the last result is returned even if rejected.
+        Only a cascade that ends without an accepted result escalates later
+        calls for ``role``."""
+        models = self.route(role, task)
+        result: Dict[str, Any] = {}
+        for model in models:
+            with self.track(role, model) as stats:
+                try:
+                    result = await run_with_deadline(call(model), timeout)
+                except asyncio.TimeoutError:
+                    result = {"output": "Agent stopped due to time limit.", "intermediate_steps": []}
+            if accept(result):
+                return result
+            stats.rejected += 1
+            budget = current_budget()
+            if budget and budget.pressure() >= DEGRADE_AT:
+                break
+        self.record_failure(role)
+        return result
+
+    def report(self) -> str:
+        """Return a per-route summary table."""
+        lines = ["role/model: calls rejected latency(s) tokens cost($)"]
+        for (role, model), s in sorted(self.stats.items()):
+            lines.append(
+                f"{role}/{model}: {s.calls} {s.rejected} {s.latency:.1f} "
+                f"{s.prompt_tokens + s.completion_tokens} {s.cost:.4f}"
+            )
+        return "\n".join(lines)
+
+
+model_router = ModelRouter()
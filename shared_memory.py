@@ -17,6 +17,11 @@ class SharedMemory:
         self._max_length = max_length
         self._counter = 0
 
+    def clear(self) -> None:
+        """Forget all entries. Long-term memory is left untouched."""
+        self._store = InMemoryStore()
+        self._counter = 0
+
     def add(self, text: str) -> None:
         """Append a new entry to memory."""
         self._store.put(("context",), str(self._counter), {"text": text})
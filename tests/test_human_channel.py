@@ -0,0 +1,58 @@
+import asyncio
+
+from human_channel import QueueChannel
+
+
+async def _responder(channel: QueueChannel, script, answered):
+    """Answer questions from ``script`` (question -> (delay, answer)) like a human would."""
+    while True:
+        question_id, question = await channel.questions.get()
+        delay, text = script[question]
+        await asyncio.sleep(delay)
+        answered[question] = channel.answer(question_id, text)
+
+
+def test_pending_question_does_not_block_other_coroutines():
+    async def scenario():
+        channel = QueueChannel(timeout=1.0)
+        answered = {}
+        responder = asyncio.create_task(
+            _responder(channel, {"Which city?": (0.2, "Paris")}, answered)
+        )
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(5):
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        reply, _ = await asyncio.gather(channel.ask("Which city?"), ticker())
+        responder.cancel()
+        return reply, ticks, answered, channel.pending()
+
+    reply, ticks, answered, pending = asyncio.run(scenario())
+    assert reply == "Paris"
+    assert ticks == 5
+    assert answered == {"Which city?": True}
+    assert pending == {}
+
+
+def test_timeout_returns_default_and_late_answer_is_rejected():
+    async def scenario():
+        channel = QueueChannel(timeout=0.05, default_answer="no answer")
+        answered = {}
+        responder = asyncio.create_task(
+            _responder(channel, {"Slow?": (0.2, "late"), "Custom?": (0.2, "late")}, answered)
+        )
+        first = await channel.ask("Slow?")
+        second = await channel.ask("Custom?", default="fallback")
+        await asyncio.sleep(0.5)
+        responder.cancel()
+        return first, second, answered, channel.pending()
+
+    first, second, answered, pending = asyncio.run(scenario())
+    assert first == "no answer"
+    assert second == "fallback"
+    assert answered == {"Slow?": False, "Custom?": False}
+    assert pending == {}
@@ -1,7 +1,8 @@
 from langchain_core.tools import StructuredTool
+from human_channel import get_human_channel
 
 async def ask_human(question: str) -> str:
     """Ask the user for information. The user will be prompted to provide an answer."""
-    return input(f"\n{question}\nInput: ")
+    return await get_human_channel().ask(question)
 
-ask_human_tool = StructuredTool.from_function(name="ask_human", coroutine=ask_human)
\ No newline at end of file
+ask_human_tool = StructuredTool.from_function(name="ask_human", coroutine=ask_human)
@@ -15,6 +15,7 @@ from langchain_core.tools import StructuredTool
 from patchright.async_api import async_playwright
 import openai
 from langchain_openai import ChatOpenAI
+from human_channel import get_human_channel
 
 if os.getenv("OPENAI_API_KEY"):
     openai.api_key = os.getenv("OPENAI_API_KEY")
@@ -25,8 +26,8 @@ else:
 controller = Controller() if Controller else None
 if controller:
     @controller.action("Ask user for information")
-    def ask_human(question: str) -> str:
-        answer = input(f"\n{question}\nInput: ")
+    async def ask_human(question: str) -> ActionResult:
+        answer = await get_human_channel().ask(question)
         return ActionResult(extracted_content=answer)
 
 if BrowserProfile:
@@ -1,11 +1,12 @@
 
+import asyncio
 from langchain_core.tools import StructuredTool
 from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
 
 async def search_duckduckgo(query: str) -> str:
     """Return the five results for a DuckDuckGo search."""
     wrapper = DuckDuckGoSearchAPIWrapper()
-    results = wrapper.results(query, max_results=5)
+    results = await asyncio.to_thread(wrapper.results, query, max_results=5)
     if not results:
         return "No results found"
 
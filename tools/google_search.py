@@ -1,10 +1,11 @@
+import asyncio
 from langchain_core.tools import StructuredTool
 from langchain_google_community import GoogleSearchAPIWrapper
 
 async def search_google(query: str) -> str:
     """Return the five results for a Google search."""
     wrapper = GoogleSearchAPIWrapper()
-    results = wrapper.results(query, num_results=5)
+    results = await asyncio.to_thread(wrapper.results, query, num_results=5)
     if not results:
         return "No results found"
     content = ""